@@ -10,29 +10,60 @@ __version__ = '1.0.0'
 import logging
 import logging.config
 import io
-import urllib.parse
-import jinja2
+import asyncio
+import os
+import re
+import stat
 import fsspec
+import fsspec.asyn
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BUFFERING = 1024 * 1024
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_MAX_CONCURRENCY = 32
+
+_SCHEME_RE = re.compile(r'^([a-zA-Z][a-zA-Z0-9+\-.]*):')
+
 INIT_CONF = {
     'reader': {'iotype': 'file'},
     'writer': {'iotype': 'file'},
 }
 
+def get_url_protocol(url):
+    """
+    Get the protocol (scheme) of the given URL
+
+    Only the scheme is extracted, without otherwise parsing the URL.  If the
+    URL has no scheme, then the protocol defaults to 'file'
+
+    :param url: The URL
+    :type url: str
+    :returns: The protocol
+    :rtype: str
+    """
+
+    m = _SCHEME_RE.match(url)
+
+    return m.group(1).lower() if m else 'file'
+
 class BaseContextManager(object):
     """
     Context manager base class
     """
 
-    def __init__(self, iostream=None, iotype='', conf={}):
+    __slots__ = ('iostream', 'iotype', 'conf', 'fp')
+
+    # Supported iotypes, each opened by the method named _open_<iotype>
+    _IOTYPES = ('file', 'url', 'str', 'bytes')
+
+    def __init__(self, iostream=None, iotype='', conf=None):
         """
         Constructor
 
-        :param iostream: Iostream (file path, URL, or str)
+        :param iostream: Iostream (file path, URL, str, or bytes)
         :type iostream: str
-        :param iotype: Type of the iostream ['file','url','str']
+        :param iotype: Type of the iostream ['file','url','str','bytes']
         :type iotype: str
         :param conf: Optional configuration
         :type conf: dict
@@ -40,7 +71,7 @@ class BaseContextManager(object):
 
         self.iostream = iostream
         self.iotype = iotype
-        self.conf = conf
+        self.conf = {} if conf is None else conf
         self.fp = None
 
         if not self.iotype:
@@ -75,28 +106,102 @@ class BaseContextManager(object):
 
         return False         # This ensures any exception is re-raised
 
-    def _construct_open_opts(self):
+    def _construct_open_opts(self, iotype):
         """
         Construct the options for the iostream open() call based on
         self.iotype, the kwargs passed to self.open() and self.conf
 
+        :param iotype: Type of the iostream, in lower case
+        :type iotype: str
         :returns: opts
         :rtype: dict
         """
 
         opts = {}
 
-        if self.iotype.lower() == 'file' or self.iotype.lower() == 'url':
-            'mode' in self.conf and opts.update({'mode': self.conf['mode']})
-            'encoding' in self.conf and opts.update({'encoding': self.conf['encoding']})
-        elif self.iotype.lower() == 'str':
-            'encoding' in self.conf and opts.update({'encoding': self.conf['encoding']})
+        if iotype == 'file' or iotype == 'url':
+            mode = self.conf.get('mode')
+
+            if mode is not None:
+                opts['mode'] = mode
+
+            encoding = self.conf.get('encoding')
+
+            if encoding is not None:
+                opts['encoding'] = encoding
 
-        logger.debug(f"effective open() options = {opts}")
+            newline = self.conf.get('newline')
+
+            if newline is not None:
+                opts['newline'] = newline
+
+        if iotype == 'file':
+            opts['buffering'] = self.conf.get('buffering', DEFAULT_BUFFERING)
+        elif iotype == 'url':
+            block_size = self.conf.get('block_size')
+
+            if block_size is not None:
+                opts['block_size'] = block_size
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('effective open() options = %s', opts)
 
         return opts
 
-    def open(self, iostream=None, iotype='', mode=None, encoding=None, **fs_opts):
+    def _open_file(self, opts, fs_opts):
+        """
+        Open a local iostream (iotype=file)
+
+        :param opts: The options for the open() call
+        :type opts: dict
+        :param fs_opts: Unused
+        :type fs_opts: dict
+        """
+
+        self.fp = io.open(self.iostream, **opts)
+
+    def _open_url(self, opts, fs_opts):
+        """
+        Open a remote iostream (iotype=url)
+
+        :param opts: The options for the open() call
+        :type opts: dict
+        :param fs_opts: Any kwargs required for opening the iostream using
+        fsspec
+        :type fs_opts: dict
+        """
+
+        protocol = get_url_protocol(self.iostream)
+        fs = fsspec.filesystem(protocol, **fs_opts)
+        self.fp = fs.open(self.iostream, **opts)
+        self.fp.remote = True
+        self.fp.protocol = protocol
+
+    def _open_str(self, opts, fs_opts):
+        """
+        Open an in-memory iostream (iotype=str)
+
+        :param opts: Unused
+        :type opts: dict
+        :param fs_opts: Unused
+        :type fs_opts: dict
+        """
+
+        self.fp = io.StringIO(self.iostream or '')
+
+    def _open_bytes(self, opts, fs_opts):
+        """
+        Open an in-memory binary iostream (iotype=bytes)
+
+        :param opts: Unused
+        :type opts: dict
+        :param fs_opts: Unused
+        :type fs_opts: dict
+        """
+
+        self.fp = io.BytesIO(self.iostream or b'')
+
+    def open(self, iostream=None, iotype='', mode=None, encoding=None, newline=None, buffering=None, block_size=None, **fs_opts):
         """
         Open the given iostream
 
@@ -111,18 +216,30 @@ class BaseContextManager(object):
         is binary, then the mode should include the binary flag (e.g. 'rb')
         and encoding must not be specified.  If the local or remote iostream
         is text, then omit the binary flag and optionally provide an encoding
-        if required.  If iotype=str, then mode must not be specified and
-        encoding is only required if it is not the system default
+        if required.  For text files and urls, newline='' can be given to
+        disable newline translation where it isn't required.  If iotype=str
+        or iotype=bytes, then neither mode nor encoding are used, as the
+        iostream is in memory
+
+        Local iostreams are opened with a buffer of DEFAULT_BUFFERING bytes,
+        unless buffering is specified.  Remote iostreams are read in blocks
+        of the filesystem's default size, unless block_size is specified
 
-        :param iostream: Iostream (file path, URL, or str)
+        :param iostream: Iostream (file path, URL, str, or bytes)
         :type iostream: str
-        :param iotype: Type of the iostream ['file','url','str'].  Raises
+        :param iotype: Type of the iostream ['file','url','str','bytes'].  Raises
         TypeError if iotype is not one of these supported types
         :type iotype: str
         :param mode: Mode in which to open if iostream is a file or url
         :type mode: str
         :param encoding: Encoding if iostream is text
         :type encoding: str
+        :param newline: Newline handling if iostream is a text file or url
+        :type newline: str
+        :param buffering: Buffer size in bytes if iostream is a file
+        :type buffering: int
+        :param block_size: Block size in bytes if iostream is a url
+        :type block_size: int
         :param fs_opts: Any kwargs required for opening a url type iostream
         using fsspec
         :type fs_opts: dict
@@ -143,27 +260,28 @@ class BaseContextManager(object):
         if encoding:
             self.conf['encoding'] = encoding
 
+        if newline is not None:
+            self.conf['newline'] = newline
+
+        if buffering is not None:
+            self.conf['buffering'] = buffering
+
+        if block_size is not None:
+            self.conf['block_size'] = block_size
+
         if fs_opts:
-            'fs_opts' in self.conf or self.conf.update({'fs_opts': {}})
-            self.conf['fs_opts'].update(**fs_opts)
-
-        logger.debug(f"effective iostream configuration = {self.conf}")
-
-        opts = self._construct_open_opts()
-
-        if self.iotype.lower() == 'file':
-            self.fp = io.open(self.iostream, **opts)
-        elif self.iotype.lower() == 'url':
-            protocol = urllib.parse.urlparse(self.iostream).scheme
-            fs = fsspec.filesystem(protocol, **fs_opts)
-            self.fp = fs.open(self.iostream, **opts)
-            self.fp.remote = True
-            self.fp.protocol = protocol
-        elif self.iotype.lower() == 'str':
-            self.fp = io.StringIO(self.iostream, **opts)
-        else:
+            self.conf.setdefault('fs_opts', {}).update(fs_opts)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('effective iostream configuration = %s', self.conf)
+
+        iotype = self.iotype.lower()
+        if iotype not in self._IOTYPES:
             raise TypeError(f"unsupported iotype {self.iotype}")
 
+        opts = self._construct_open_opts(iotype)
+        getattr(self, '_open_' + iotype)(opts, fs_opts)
+
         return self
 
     def close(self):
@@ -184,6 +302,8 @@ class BaseReader(BaseContextManager):
     Context manager for reading input
     """
 
+    __slots__ = ('input',)
+
     def __init__(self, **kwargs):
         """
         Constructor
@@ -207,17 +327,41 @@ class BaseReader(BaseContextManager):
 
         return super().open(mode=mode, **kwargs)
 
+    def read_chunks(self, chunk_size=None):
+        """
+        Read the input iostream in chunks
+
+        If chunk_size is not provided, then it is taken from self.conf,
+        falling back to DEFAULT_CHUNK_SIZE
+
+        :param chunk_size: Size of each chunk (characters if text, bytes if
+        binary)
+        :type chunk_size: int
+        :returns: A generator of chunks
+        :rtype: generator
+        """
+
+        chunk_size = chunk_size or self.conf.get('chunk_size', DEFAULT_CHUNK_SIZE)
+
+        while chunk := self.fp.read(chunk_size):
+            yield chunk
+
     def read(self):
         """
         Read the input iostream
 
-        The input is loaded as a str and accessible via self.input
+        The input is loaded as a str (or bytes if the iostream is binary)
+        and accessible via self.input.  Text input is read in chunks, to
+        avoid the iostream holding an additional copy of the whole input
 
         :returns: The input
         :rtype: str
         """
 
-        self.input = self.fp.read()
+        if isinstance(self.fp, io.TextIOBase):
+            self.input = ''.join(self.read_chunks())
+        else:
+            self.input = self.fp.read()
 
         return self.input
 
@@ -226,6 +370,8 @@ class BaseWriter(BaseContextManager):
     Context manager for writing output
     """
 
+    __slots__ = ('output', '_env', '_compiled_template', '_compiled_template_name')
+
     DEFAULTS = {
        'template': None
     }
@@ -235,10 +381,108 @@ class BaseWriter(BaseContextManager):
         Constructor
 
         Takes the same arguments as super.__init__()
+
+        If a default template is set, then it is loaded here, so that
+        infilling it doesn't need to resolve it again
         """
 
         super().__init__(**kwargs)
         self.output = None
+        self._env = None
+        self._compiled_template = None
+        self._compiled_template_name = None
+
+        if self.DEFAULTS.get('template'):
+            self.load_template(self.DEFAULTS['template'])
+
+    def _construct_template_env(self):
+        """
+        Construct the jinja2 environment used to load and render templates
+
+        The environment is constructed once per writer, when a template is
+        first loaded, so that compiled templates are cached across calls to
+        self.infill_template().  If `template_cache_dir` is set in
+        self.conf, then compiled template bytecode is also cached in that
+        directory.  The source of the default template is read once, up
+        front, so loading it doesn't touch the filesystem; any other
+        template is loaded from the filesystem
+
+        :returns: The template environment
+        :rtype: jinja2.Environment
+        """
+
+        # Imported here, so that workflows without templates don't pay for it
+        import jinja2
+
+        bytecode_cache = None
+        sources = {}
+
+        if self.conf.get('template_cache_dir'):
+            bytecode_cache = jinja2.FileSystemBytecodeCache(self.conf['template_cache_dir'])
+
+        if self.DEFAULTS.get('template'):
+            template = os.fspath(self.DEFAULTS['template'])
+
+            try:
+                with io.open(template, 'r', encoding='utf-8') as fp:
+                    sources[template] = fp.read()
+            except OSError:
+                # Leave the filesystem loader to report the missing template
+                pass
+
+        loader = jinja2.ChoiceLoader([jinja2.DictLoader(sources), jinja2.FileSystemLoader('/')])
+
+        return jinja2.Environment(loader=loader, trim_blocks=True, lstrip_blocks=True, auto_reload=False, bytecode_cache=bytecode_cache)
+
+    def _get_template_env(self):
+        """
+        Get the template environment, constructing it on first use
+
+        :returns: The template environment
+        :rtype: jinja2.Environment
+        """
+
+        if self._env is None:
+            self._env = self._construct_template_env()
+
+        return self._env
+
+    def load_template(self, template):
+        """
+        Load the given template
+
+        The most recently loaded template is kept, so that repeatedly
+        loading the same template doesn't go through the loader again
+
+        :param template: Template path
+        :type template: str or os.PathLike
+        :returns: The compiled template
+        :rtype: jinja2.Template
+        """
+
+        template = os.fspath(template)
+
+        if template != self._compiled_template_name:
+            self._compiled_template = self._get_template_env().get_template(template)
+            self._compiled_template_name = template
+
+        return self._compiled_template
+
+    def precompile_templates(self, templates):
+        """
+        Compile the given templates into the template environment's cache
+
+        Unlike self.load_template(), this doesn't change the most recently
+        loaded template, so the default template stays the current one
+
+        :param templates: Template paths
+        :type templates: iterable
+        """
+
+        env = self._get_template_env()
+
+        for template in templates:
+            env.get_template(os.fspath(template))
 
     def open(self, mode=None, **kwargs):
         """
@@ -270,13 +514,12 @@ class BaseWriter(BaseContextManager):
         :rtype: str
         """
 
-        if not template:
-            template = self.DEFAULTS['template']
+        template = template or self.DEFAULTS['template']
 
         if not template:
             self.output = data
         else:
-            self.output = jinja2.Environment(loader=jinja2.FileSystemLoader('/'), trim_blocks=True, lstrip_blocks=True).get_template(template).render(data)
+            self.output = self.load_template(template).render(data)
 
         return self.output
 
@@ -318,7 +561,9 @@ class BaseProcessor(object):
     Execute an input to output processing workflow
     """
 
-    def __init__(self, reader, writer, conf={}):
+    __slots__ = ('reader', 'writer', 'conf', 'input', 'output')
+
+    def __init__(self, reader, writer, conf=None):
         """
         Constructor
 
@@ -332,27 +577,261 @@ class BaseProcessor(object):
 
         self.reader = reader
         self.writer = writer
-        self.conf = conf
+        self.conf = {} if conf is None else conf
         self.input = None
         self.output = None
 
+    def _is_same_file(self):
+        """
+        Check whether the input and output are the same local file
+
+        :returns: True if they are the same file, False otherwise
+        :rtype: bool
+        """
+
+        if not (self.reader.iotype.lower() == self.writer.iotype.lower() == 'file'):
+            return False
+
+        try:
+            return os.path.samefile(self.reader.iostream, self.writer.iostream)
+        except (OSError, TypeError, ValueError):
+            # The output doesn't exist (yet), or either isn't a valid path
+            return False
+
+    def can_stream(self):
+        """
+        Check whether the input can be streamed directly to the output
+
+        This is the case when neither the reader nor the writer transform
+        the data, there is no template to infill, the output isn't
+        required to be accessible via self.writer.output (iotype=str or
+        iotype=bytes), and the output isn't the input file (as opening the
+        output would truncate the input before it's read)
+
+        :returns: True if the input can be streamed, False otherwise
+        :rtype: bool
+        """
+
+        return (isinstance(self.reader, BaseReader)
+            and isinstance(self.writer, BaseWriter)
+            and type(self.reader).read is BaseReader.read
+            and type(self.writer).write is BaseWriter.write
+            and type(self.writer).transform is BaseWriter.transform
+            and type(self.writer).infill_template is BaseWriter.infill_template
+            and not self.writer.DEFAULTS.get('template')
+            and self.writer.iotype.lower() not in ('str', 'bytes')
+            and not self._is_same_file())
+
+    def _sendfile(self):
+        """
+        Copy the input to the output within the kernel, using os.sendfile()
+
+        This is only possible when both the input and output are local
+        binary files, the input is a non-empty regular file, and the
+        platform supports os.sendfile() between files
+
+        :returns: True if the input was copied, False otherwise
+        :rtype: bool
+        """
+
+        if not hasattr(os, 'sendfile'):
+            return False
+
+        if not (self.reader.iotype.lower() == self.writer.iotype.lower() == 'file'):
+            return False
+
+        if isinstance(self.reader.fp, io.TextIOBase) or isinstance(self.writer.fp, io.TextIOBase):
+            return False
+
+        src_fd = self.reader.fp.fileno()
+        dst_fd = self.writer.fp.fileno()
+        src_stat = os.fstat(src_fd)
+
+        # Pipes can't be seeked, and some regular files (e.g. in /proc)
+        # report a size of 0 despite having content, so neither is a safe
+        # basis for the copy
+        if not stat.S_ISREG(src_stat.st_mode) or not src_stat.st_size or not self.reader.fp.seekable():
+            return False
+
+        start = offset = self.reader.fp.tell()
+        self.writer.fp.flush()
+
+        # Copy until the input is exhausted, rather than trusting its size
+        while True:
+            try:
+                n = os.sendfile(dst_fd, src_fd, offset, max(src_stat.st_size - offset, DEFAULT_CHUNK_SIZE))
+            except OSError:
+                # Fall back to copying via userspace if nothing was sent yet
+                if offset == start:
+                    return False
+
+                raise
+
+            if n == 0:
+                break
+
+            offset += n
+
+        return True
+
     def process(self):
         """
         Process the input to output
+
+        If the input can be streamed, then it is copied to the output
+        chunk by chunk, without loading the whole input into memory.  If
+        both are local binary files, then the copy is done by the kernel
+        """
+
+        if self.can_stream():
+            with self.reader as r, self.writer as w:
+                if not self._sendfile():
+                    for chunk in r.read_chunks():
+                        w.fp.write(chunk)
+        else:
+            with self.reader as fp:
+                self.input = fp.read()
+
+            with self.writer as fp:
+                fp.write(self.input)
+
+class AsyncBaseProcessor(BaseProcessor):
+    """
+    Execute an input to output processing workflow for many url sources
+    concurrently
+    """
+
+    __slots__ = ()
+
+    async def _get_filesystem(self, source, filesystems, sessions):
+        """
+        Get an async fsspec filesystem for the protocol of the given source
+
+        One filesystem is constructed per protocol, for the duration of a
+        call to self.process_many()
+
+        :param source: The input url
+        :type source: str
+        :param filesystems: The filesystems constructed so far, by protocol
+        :type filesystems: dict
+        :param sessions: The sessions opened so far
+        :type sessions: list
+        :returns: The filesystem
+        :rtype: fsspec.asyn.AsyncFileSystem
+        :raises: TypeError
         """
 
-        with self.reader as fp:
-            self.input = fp.read()
+        protocol = get_url_protocol(source)
+        fs = filesystems.get(protocol)
+
+        if fs is None:
+            fs_opts = self.reader.conf.get('fs_opts', {})
+            fs = fsspec.filesystem(protocol, asynchronous=True, skip_instance_cache=True, **fs_opts)
+
+            if not isinstance(fs, fsspec.asyn.AsyncFileSystem):
+                raise TypeError(f"protocol {protocol} does not support async")
+
+            # Some async filesystems (e.g. http) need a session to be opened
+            if hasattr(fs, 'set_session'):
+                sessions.append(await fs.set_session())
+
+            filesystems[protocol] = fs
+
+        return fs
+
+    def _decode(self, data):
+        """
+        Decode the fetched data according to the reader's configuration
+
+        If the reader's mode is binary, then the data are returned as-is,
+        otherwise they are decoded as text, as they would be by the reader
+
+        :param data: The fetched data
+        :type data: bytes
+        :returns: The input
+        :rtype: str
+        """
+
+        if 'b' in self.reader.conf.get('mode', 'r'):
+            return data
+
+        with io.TextIOWrapper(io.BytesIO(data), encoding=self.reader.conf.get('encoding'), newline=self.reader.conf.get('newline')) as fp:
+            return fp.read()
+
+    async def _process_one(self, fs, source, sink, semaphore):
+        """
+        Fetch the given source and write it to the given sink
+
+        :param fs: The filesystem for the source
+        :type fs: fsspec.asyn.AsyncFileSystem
+        :param source: The input url
+        :type source: str
+        :param sink: The output iostream
+        :type sink: str
+        :param semaphore: Bounds the number of in-flight fetches
+        :type semaphore: asyncio.Semaphore
+        """
+
+        async with semaphore:
+            data = await fs._cat_file(source)
+
+        # Writing doesn't await, so tasks can't interleave on the writer
+        self.writer.iostream = sink
 
         with self.writer as fp:
-            fp.write(self.input)
+            fp.write(self._decode(data))
+
+    async def process_many(self, sources, sinks):
+        """
+        Process each source to its corresponding sink
+
+        The sources are fetched concurrently, with at most `max_concurrency`
+        (from self.conf, else DEFAULT_MAX_CONCURRENCY) fetches in flight.
+        Each source is written via the writer as soon as it has been
+        fetched.  The reader's fs_opts, mode and encoding are honoured, but
+        its read() isn't called.  If any source fails, then the remaining
+        fetches are cancelled and the error is re-raised
+
+        As each sink would overwrite self.writer.output, the writer can't be
+        an in-memory iostream (iotype=str or iotype=bytes)
+
+        :param sources: The input urls
+        :type sources: iterable
+        :param sinks: The output iostreams
+        :type sinks: iterable
+        :raises: TypeError
+        """
+
+        if self.writer.iotype.lower() in ('str', 'bytes'):
+            raise TypeError(f"unsupported writer iotype {self.writer.iotype} for concurrent processing")
+
+        semaphore = asyncio.Semaphore(self.conf.get('max_concurrency', DEFAULT_MAX_CONCURRENCY))
+        filesystems = {}
+        sessions = []
+        tasks = []
+
+        try:
+            for source, sink in zip(sources, sinks):
+                fs = await self._get_filesystem(source, filesystems, sessions)
+                tasks.append(asyncio.ensure_future(self._process_one(fs, source, sink, semaphore)))
+
+            await asyncio.gather(*tasks)
+        finally:
+            # Ensure no task is still using a session when it's closed
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            for session in sessions:
+                await session.close()
 
 class BaseWorkflow(object):
     """
     Setup an input to output processing workflow
     """
 
-    def __init__(self, reader_class=BaseReader, writer_class=BaseWriter, processor_class=BaseProcessor, conf={}):
+    def __init__(self, reader_class=BaseReader, writer_class=BaseWriter, processor_class=BaseProcessor, conf=None):
         """
         Constructor
 
@@ -369,9 +848,12 @@ class BaseWorkflow(object):
         self.reader_class = reader_class
         self.writer_class = writer_class
         self.processor_class = processor_class
-        self.conf = conf
+        self.conf = {} if conf is None else conf
         self.source = None
         self.sink = None
+        self.reader = None
+        self.writer = None
+        self.processor = None
 
     def get_conf_section(self, section):
         """
@@ -405,16 +887,69 @@ class BaseWorkflow(object):
         if logging_conf:
             logging.config.dictConfig(logging_conf)
 
-    def process(self):
+    def _precompile_templates(self):
         """
-        Process the input to output
+        Compile the writer's templates ahead of processing
+
+        The writer's default template is already loaded when the writer is
+        constructed.  Any other templates the writer may use can be listed
+        in the `templates` item of the `writer` configuration section, and
+        they are compiled here, so that no compilation happens whilst
+        writing
+        """
+
+        if not isinstance(self.writer, BaseWriter):
+            return
+
+        templates = (self.get_conf_section('writer') or {}).get('templates')
+
+        if templates:
+            self.writer.precompile_templates(templates)
+
+    def _build_components(self):
+        """
+        Construct the reader, writer and processor for the workflow
+
+        The components are constructed once, and then reused for each
+        source and sink processed by the workflow
         """
 
         self.reader = self.reader_class(iostream=self.source, conf=self.get_conf_section('reader'))
         self.writer = self.writer_class(iostream=self.sink, conf=self.get_conf_section('writer'))
+        self._precompile_templates()
         self.processor = self.processor_class(self.reader, self.writer, conf=self.get_conf_section('processor'))
+
+    def _process_once(self, source, sink):
+        """
+        Process the given source to the given sink
+
+        :param source: The input iostream
+        :type source: str
+        :param sink: The output iostream
+        :type sink: str
+        """
+
+        self.reader.iostream = source
+        self.writer.iostream = sink
+
+        # Clear any state left over from processing a previous source
+        self.reader.input = None
+        self.writer.output = None
+        self.processor.input = None
+        self.processor.output = None
+
         self.processor.process()
 
+    def process(self):
+        """
+        Process the input to output
+        """
+
+        if self.processor is None:
+            self._build_components()
+
+        self._process_once(self.source, self.sink)
+
     def run(self, source, sink):
         """
         Run the input to output workflow
@@ -425,3 +960,57 @@ class BaseWorkflow(object):
         self.setup_logging()
         self.process()
 
+    def run_many(self, sources, sinks):
+        """
+        Run the input to output workflow for each source and sink pair
+
+        The same reader, writer and processor are used for all pairs
+
+        :param sources: The input iostreams
+        :type sources: iterable
+        :param sinks: The output iostreams
+        :type sinks: iterable
+        """
+
+        self.setup_logging()
+
+        for source, sink in zip(sources, sinks):
+            self.source = source
+            self.sink = sink
+            self.process()
+
+class AsyncBaseWorkflow(BaseWorkflow):
+    """
+    Setup an input to output processing workflow for many url sources,
+    processed concurrently
+    """
+
+    def __init__(self, reader_class=BaseReader, writer_class=BaseWriter, processor_class=AsyncBaseProcessor, conf=None):
+        """
+        Constructor
+
+        Takes the same arguments as super.__init__(), but the processor
+        class defaults to AsyncBaseProcessor
+        """
+
+        super().__init__(reader_class=reader_class, writer_class=writer_class, processor_class=processor_class, conf=conf)
+
+    def run_many(self, sources, sinks):
+        """
+        Run the input to output workflow for each source and sink pair
+
+        The sources are fetched concurrently.  This must not be called from
+        a running event loop
+
+        :param sources: The input urls
+        :type sources: iterable
+        :param sinks: The output iostreams
+        :type sinks: iterable
+        """
+
+        self.setup_logging()
+
+        if self.processor is None:
+            self._build_components()
+
+        asyncio.run(self.processor.process_many(sources, sinks))
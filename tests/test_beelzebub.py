@@ -1,9 +1,12 @@
+import io
 import os
+import pathlib
+import threading
 
 import pytest
 from aioresponses import aioresponses
 
-from beelzebub.base import BaseContextManager, BaseReader, BaseWriter, BaseProcessor, BaseWorkflow
+from beelzebub.base import get_url_protocol, BaseContextManager, BaseReader, BaseWriter, BaseProcessor, BaseWorkflow, AsyncBaseWorkflow
 
 class TestBeelzebub():
 
@@ -64,6 +67,30 @@ class TestBeelzebub():
         f.read()
         f.close()
 
+    @pytest.mark.parametrize(['cls'], [
+    (BaseReader,),
+    (BaseWriter,),
+    ])
+    def test_context_managers_are_slotted(self, cls):
+        f = cls(iotype='str')
+        assert not hasattr(f, '__dict__')
+
+    def test_default_conf_is_not_shared(self):
+        f1 = BaseReader(iotype='str')
+        f2 = BaseReader(iotype='str')
+        f1.open(mode='rb')
+        f1.close()
+        assert f1.conf is not f2.conf
+        assert 'mode' not in f2.conf
+
+    def test_workflow_without_conf_sections(self):
+        source = self.base + '/short-test-data.json'
+
+        f = BaseWorkflow(conf={})
+        assert f.get_conf_section('reader') is None
+        f.reader = BaseReader(iostream=source, conf=f.get_conf_section('reader'))
+        assert f.reader.conf == {}
+
     def test_iotype_set_via_kwarg_in_constructor(self):
         f = BaseReader(iotype='file')
         assert f.iotype == 'file'
@@ -103,6 +130,37 @@ class TestBeelzebub():
         with pytest.raises(TypeError):
             f.open()
 
+    @pytest.mark.parametrize(['mode', 'chunk_size'], [
+    ('r', None),
+    ('r', 7),
+    ('rb', None),
+    ('rb', 7),
+    ])
+    def test_chunked_read(self, mode, chunk_size):
+        in_file = self.base + '/short-test-data.json'
+        conf = {'iotype': 'file', 'mode': mode}
+        chunk_size and conf.update({'chunk_size': chunk_size})
+
+        with open(in_file, mode) as fp:
+            expected = fp.read()
+
+        f = BaseReader(iostream=in_file, conf=conf)
+        f.open()
+        assert f.read() == expected
+        assert type(f.input) is type(expected)
+        f.close()
+
+    def test_opener_can_be_overridden(self):
+        class UpperReader(BaseReader):
+            def _open_str(self, opts, fs_opts):
+                super()._open_str(opts, fs_opts)
+                self.fp = io.StringIO(self.fp.read().upper())
+
+        f = UpperReader(iostream='this is the input', iotype='str')
+        f.open()
+        assert f.read() == 'THIS IS THE INPUT'
+        f.close()
+
     def test_str_to_str_workflow(self):
         conf = {'reader': {'iotype': 'str'}, 'writer': {'iotype': 'str'}}
         source = 'this is the input'
@@ -112,6 +170,145 @@ class TestBeelzebub():
         f.run(source, sink)
         assert f.writer.output == source
 
+    @pytest.mark.parametrize(['conf'], [
+    ({'reader': {'iotype': 'file'}, 'writer': {'iotype': 'file'}},),
+    ({'reader': {'iotype': 'file', 'mode': 'rb', 'chunk_size': 7}, 'writer': {'iotype': 'file', 'mode': 'wb'}},),
+    ])
+    def test_file_to_file_workflow(self, conf, tmp_path):
+        source = self.base + '/short-test-data.json'
+        sink = str(tmp_path / 'short-test-data.json')
+
+        f = BaseWorkflow(conf=conf)
+        assert f.processor_class(BaseReader(conf=conf['reader']), BaseWriter(conf=conf['writer'])).can_stream()
+        f.run(source, sink)
+
+        with open(source, 'rb') as fp1, open(sink, 'rb') as fp2:
+            assert fp1.read() == fp2.read()
+
+    def test_file_to_same_file_workflow(self, tmp_path):
+        conf = {'reader': {'iotype': 'file'}, 'writer': {'iotype': 'file'}}
+        path = tmp_path / 'same.txt'
+        path.write_text('data\n')
+
+        f = BaseWorkflow(conf=conf)
+        f.run(str(path), str(path))
+        assert path.read_text() == 'data\n'
+
+    @pytest.mark.skipif(not hasattr(os, 'sendfile'), reason='requires os.sendfile')
+    def test_binary_file_to_file_workflow_uses_sendfile(self, tmp_path, monkeypatch):
+        conf = {'reader': {'iotype': 'file', 'mode': 'rb'}, 'writer': {'iotype': 'file', 'mode': 'wb'}}
+        source = self.base + '/non-utf8.txt'
+        sink = str(tmp_path / 'non-utf8.txt')
+        calls = []
+        sendfile = os.sendfile
+
+        def counting_sendfile(*args):
+            calls.append(args)
+            return sendfile(*args)
+
+        monkeypatch.setattr(os, 'sendfile', counting_sendfile)
+
+        f = BaseWorkflow(conf=conf)
+        f.run(source, sink)
+        assert calls
+
+        with open(source, 'rb') as fp1, open(sink, 'rb') as fp2:
+            assert fp1.read() == fp2.read()
+
+    def test_run_many_reuses_components(self, tmp_path):
+        conf = {'reader': {'iotype': 'file'}, 'writer': {'iotype': 'file'}}
+        sources = [self.base + '/short-test-data.json', self.base + '/short-test-data.json']
+        sinks = [str(tmp_path / 'out1.json'), str(tmp_path / 'out2.json')]
+
+        f = BaseWorkflow(conf=conf)
+        f.run_many(sources[:1], sinks[:1])
+        reader, writer = f.reader, f.writer
+        f.run_many(sources[1:], sinks[1:])
+        assert f.reader is reader and f.writer is writer
+
+        with open(sources[0]) as fp:
+            expected = fp.read()
+
+        for sink in sinks:
+            with open(sink) as fp:
+                assert fp.read() == expected
+
+    def test_bytes_to_bytes_workflow(self):
+        conf = {'reader': {'iotype': 'bytes'}, 'writer': {'iotype': 'bytes'}}
+        source = 'h\xe9llo'.encode('windows-1252')
+        sink = None
+
+        f = BaseWorkflow(conf=conf)
+        f.run(source, sink)
+        assert f.writer.output == source
+        assert isinstance(f.writer.output, bytes)
+
+    def test_binary_file_to_bytes_workflow(self):
+        conf = {'reader': {'iotype': 'file', 'mode': 'rb'}, 'writer': {'iotype': 'bytes'}}
+        source = self.base + '/non-utf8.txt'
+        sink = None
+
+        f = BaseWorkflow(conf=conf)
+        f.run(source, sink)
+
+        with open(source, 'rb') as fp:
+            assert f.writer.output == fp.read()
+
+    def test_str_to_str_workflow_ignores_encoding(self):
+        conf = {'reader': {'iotype': 'str', 'encoding': 'windows-1252'}, 'writer': {'iotype': 'str'}}
+        source = 'this is the input'
+        sink = None
+
+        f = BaseWorkflow(conf=conf)
+        f.run(source, sink)
+        assert f.writer.output == source
+
+    @pytest.mark.skipif(not hasattr(os, 'mkfifo'), reason='requires os.mkfifo')
+    def test_binary_fifo_to_file_workflow(self, tmp_path):
+        conf = {'reader': {'iotype': 'file', 'mode': 'rb'}, 'writer': {'iotype': 'file', 'mode': 'wb'}}
+        source = str(tmp_path / 'fifo')
+        sink = str(tmp_path / 'out.dat')
+        body = b'data via a fifo\n'
+        os.mkfifo(source)
+
+        def feed():
+            with open(source, 'wb') as fp:
+                fp.write(body)
+
+        t = threading.Thread(target=feed)
+        t.start()
+        f = BaseWorkflow(conf=conf)
+        f.run(source, sink)
+        t.join()
+
+        with open(sink, 'rb') as fp:
+            assert fp.read() == body
+
+    @pytest.mark.skipif(not os.path.exists('/proc/self/status'), reason='requires /proc')
+    def test_binary_proc_file_to_file_workflow(self, tmp_path):
+        conf = {'reader': {'iotype': 'file', 'mode': 'rb'}, 'writer': {'iotype': 'file', 'mode': 'wb'}}
+        source = '/proc/self/status'
+        sink = str(tmp_path / 'status')
+        assert os.stat(source).st_size == 0
+
+        f = BaseWorkflow(conf=conf)
+        f.run(source, sink)
+
+        with open(sink, 'rb') as fp:
+            assert b'Name:' in fp.read()
+
+    def test_run_many_clears_previous_state(self, tmp_path):
+        conf = {'reader': {'iotype': 'file'}, 'writer': {'iotype': 'file'}}
+        sink = str(tmp_path / 'out.json')
+
+        f = BaseWorkflow(conf=conf)
+        f.run_many([self.base + '/short-test-data.json'], [sink])
+        f.reader.input = f.writer.output = f.processor.input = 'stale'
+        f.run_many([self.base + '/short-test-data.json'], [sink])
+        assert f.reader.input is None
+        assert f.writer.output is None
+        assert f.processor.input is None
+
     @pytest.mark.parametrize(['conf', 'source', 'sentinel_text'], [
     ({'reader': {'iotype': 'file'}, 'writer': {'iotype': 'str'}},  base + '/short-test-data.json', 'schema'),
     ({'reader': {'iotype': 'file', 'encoding': 'windows-1252'}, 'writer': {'iotype': 'str'}},  base + '/non-utf8.txt', 'hello'),
@@ -179,6 +376,9 @@ class TestBeelzebub():
     ({}, {'iotype': 'file'}, {}),
     ({}, {'iotype': 'file', 'mode': 'rb'}, {'mode': 'rb'}),
     ({}, {'iotype': 'file', 'mode': 'r', 'encoding': 'utf-8'}, {'mode': 'r', 'encoding': 'utf-8'}),
+    ({'iotype': 'file', 'mode': 'rb'}, {'buffering': 65536}, {'iotype': 'file', 'mode': 'rb', 'buffering': 65536}),
+    ({'iotype': 'file', 'mode': 'rb'}, {'buffering': 0}, {'iotype': 'file', 'mode': 'rb', 'buffering': 0}),
+    ({'iotype': 'file', 'mode': 'r'}, {'newline': ''}, {'iotype': 'file', 'mode': 'r', 'newline': ''}),
     ])
     def test_effective_conf(self, init_conf, open_kwargs, expected):
         in_file = self.base + '/short-test-data.json'
@@ -205,3 +405,145 @@ class TestBeelzebub():
             assert f.input == body
             f.close()
 
+    def test_template_env_is_reused(self):
+        template = self.base + '/test-template.j2'
+
+        class TemplateWriter(BaseWriter):
+            DEFAULTS = {'template': template}
+
+        f = TemplateWriter(conf={'iotype': 'str'})
+        env = f._env
+        compiled = f._compiled_template
+        assert f.infill_template({'items': ['a', 'b']}) == 'a\nb\n'
+        assert f._compiled_template is compiled
+        assert template in env.loader.loaders[0].mapping
+        assert f.infill_template({'items': ['c']}) == 'c\n'
+        assert f._env is env
+        assert len(env.cache) == 1
+
+    def test_writer_without_template_has_no_env(self):
+        f = BaseWriter(conf={'iotype': 'str'})
+        assert f.infill_template('data') == 'data'
+        assert f._env is None
+
+    def test_writer_defaults_without_template(self):
+        class CSVWriter(BaseWriter):
+            DEFAULTS = {'delimiter': ','}
+
+            def transform(self, data):
+                self.output = self.DEFAULTS['delimiter'].join(data)
+                return self.output
+
+        f = CSVWriter(conf={'iotype': 'str'})
+        f.open()
+        assert f.write(['a', 'b']) == 'a,b'
+        f.close()
+
+    def test_explicit_template_with_empty_defaults(self):
+        template = self.base + '/test-template.j2'
+
+        class NoDefaultsWriter(BaseWriter):
+            DEFAULTS = {}
+
+        f = NoDefaultsWriter(conf={'iotype': 'str'})
+        assert f.infill_template({'items': ['x']}, template=template) == 'x\n'
+
+    def test_template_path_like(self):
+        template = pathlib.Path(self.base) / 'test-template.j2'
+
+        class TemplateWriter(BaseWriter):
+            DEFAULTS = {'template': template}
+
+        f = TemplateWriter(conf={'iotype': 'str'})
+        assert f._compiled_template_name == str(template)
+        assert f.infill_template({'items': ['a']}) == 'a\n'
+
+    def test_template_is_memoized(self):
+        template = self.base + '/test-template.j2'
+
+        f = BaseWriter(conf={'iotype': 'str'})
+        compiled = f.load_template(template)
+        assert f.load_template(template) is compiled
+        assert f.infill_template({'items': ['a']}, template=template) == 'a\n'
+        assert f._compiled_template is compiled
+
+    @pytest.mark.parametrize(['url', 'expected'], [
+    ('https://host/path/data.txt', 'https'),
+    ('s3://bucket/data.txt', 's3'),
+    ('file:///path/data.txt', 'file'),
+    ('mailto:user@host', 'mailto'),
+    ('/path/data.txt', 'file'),
+    ('HTTPS://host/path/data.txt', 'https'),
+    ('path/to?q=https://host', 'file'),
+    ])
+    def test_get_url_protocol(self, url, expected):
+        assert get_url_protocol(url) == expected
+
+    def test_templates_are_precompiled(self):
+        template = self.base + '/test-template.j2'
+        alt_template = self.base + '/test-template-alt.j2'
+        conf = {'reader': {'iotype': 'str'}, 'writer': {'iotype': 'str', 'templates': [alt_template]}}
+
+        class TemplateWriter(BaseWriter):
+            DEFAULTS = {'template': template}
+
+        class TemplateReader(BaseReader):
+            def read(self):
+                self.input = {'items': super().read().split()}
+                return self.input
+
+        f = BaseWorkflow(reader_class=TemplateReader, writer_class=TemplateWriter, conf=conf)
+        f._build_components()
+        assert f.writer.output is None
+        assert alt_template in [name for _, name in f.writer._env.cache.keys()]
+        assert f.writer._compiled_template_name == template
+
+        f.run('a b', None)
+        assert f.writer.output == 'a\nb\n'
+        assert f.writer.infill_template({'items': ['a', 'b']}, template=alt_template) == 'a,b'
+
+    @pytest.mark.parametrize(['conf', 'bodies'], [
+    ({'reader': {'iotype': 'url'}, 'writer': {'iotype': 'file'}}, ['test1', 'test2', 'test3']),
+    ({'reader': {'iotype': 'url', 'mode': 'rb'}, 'writer': {'iotype': 'file', 'mode': 'wb'}, 'processor': {'max_concurrency': 2}}, [b'test1', b'test2', b'test3']),
+    ])
+    def test_async_url_workflow(self, conf, bodies, tmp_path):
+        urls = [f"https://host/path/data{i}.txt" for i in range(len(bodies))]
+        sinks = [str(tmp_path / f"data{i}.txt") for i in range(len(bodies))]
+
+        with aioresponses() as m:
+            for url, body in zip(urls, bodies):
+                m.get(url, body=body)
+
+            f = AsyncBaseWorkflow(conf=conf)
+            f.run_many(urls, sinks)
+
+        for sink, body in zip(sinks, bodies):
+            with open(sink, conf['writer'].get('mode', 'w').replace('w', 'r')) as fp:
+                assert fp.read() == body
+
+    def test_async_url_workflow_failure(self, tmp_path):
+        conf = {'reader': {'iotype': 'url'}, 'writer': {'iotype': 'file'}}
+        urls = [f"https://host/path/data{i}.txt" for i in range(3)]
+        sinks = [str(tmp_path / f"data{i}.txt") for i in range(3)]
+
+        with aioresponses() as m:
+            m.get(urls[0], body='test0')
+            m.get(urls[1], status=404)
+            m.get(urls[2], body='test2')
+
+            f = AsyncBaseWorkflow(conf=conf)
+
+            with pytest.raises(FileNotFoundError):
+                f.run_many(urls, sinks)
+
+    @pytest.mark.parametrize(['iotype'], [
+    ('str',),
+    ('bytes',),
+    ])
+    def test_async_url_workflow_in_memory_writer(self, iotype):
+        conf = {'reader': {'iotype': 'url'}, 'writer': {'iotype': iotype}}
+
+        f = AsyncBaseWorkflow(conf=conf)
+
+        with pytest.raises(TypeError):
+            f.run_many(['https://host/path/data.txt'], [None])